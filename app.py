@@ -7,21 +7,90 @@ A lightweight Flask service that:
 - Only sends predefined message templates
 - Handles Telegram bot commands (/summary, /detailed)
 
-Run: python app.py
+Run: gunicorn app:app  (production, see gunicorn.conf.py)
+     python app.py      (local development server)
 """
 
+import hashlib
+import heapq
+import hmac
 import json
 import logging
+import math
 import os
-from datetime import datetime
-from functools import wraps
+import queue
+import string
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
 from pathlib import Path
+from uuid import uuid4
 
 import requests
 from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON codec: orjson when installed, stdlib json otherwise. Both accept bytes.
+if orjson is not None:
+    json_loads = orjson.loads
+    json_dumpb = orjson.dumps
+else:
+    json_loads = json.loads
+
+    def json_dumpb(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (if available) for get_json and jsonify."""
+
+    def dumps(self, obj, **kwargs):
+        return json_dumpb(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return json_loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand the encoded bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_dumpb(obj), mimetype="application/json")
+
+
+VERSION = "1.1.0"
 
 app = Flask(__name__)
 app.config["JSON_SORT_KEYS"] = False
+app.json = FastJSONProvider(app)
+app.url_map.strict_slashes = False
+app.config["MAX_CONTENT_LENGTH"] = 64 * 1024
+
+# Upper bound on recipients per /send/batch (and messages per /send/aggregate)
+MAX_BATCH_SIZE = 1000
+
+# Telegram rejects message texts longer than this
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+AGGREGATE_SEPARATOR = "\n---\n"
+
+# Constant error bodies, serialized once at import
+ERR_MISSING_API_KEY = json_dumpb({"error": "Missing API key"})
+ERR_INVALID_API_KEY = json_dumpb({"error": "Invalid API key"})
+ERR_NO_BODY = json_dumpb({"error": "Request body required"})
+ERR_TOO_LARGE = json_dumpb({"error": "Request body too large"})
+
+
+def json_response(body: bytes, status: int = 200):
+    """Wrap pre-serialized JSON bytes in a fresh response."""
+    return app.response_class(body, status=status, mimetype="application/json")
+
 
 # Setup logging
 logging.basicConfig(
@@ -44,54 +113,350 @@ DEFAULT_TEMPLATES = {
     "custom": "{message}"
 }
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def make_session(pool_maxsize: int, retry: Retry) -> requests.Session:
+    """Create a pooled keep-alive session using the given retry policy."""
+    session = requests.Session()
+    session.headers["User-Agent"] = f"message-relay/{VERSION}"
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared HTTP sessions so outbound calls reuse pooled keep-alive connections.
+# Telegram sends are POSTs, which urllib3 never retries on read errors or
+# status codes (a retry could deliver the message twice), so only failed
+# connects are retried there. VM Monitor reads are idempotent GETs and also
+# retry transient 429/5xx responses.
+TELEGRAM_SESSION = make_session(
+    pool_maxsize=64,
+    retry=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.2),
+)
+VM_SESSION = make_session(
+    pool_maxsize=20,
+    retry=Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+)
+
+# Worker pool for fanning out batch sends (Telegram allows ~30 msg/s per bot)
+EXECUTOR = ThreadPoolExecutor(max_workers=30, thread_name_prefix="telegram-send")
+
+# Separate pool for bot commands so the webhook can ack Telegram immediately
+COMMAND_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="bot-command")
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    acquire() sleeps for a deficit of at most max_wait seconds; if the wait
+    would be longer it takes nothing and reports how long to come back
+    after, so callers in shared worker pools never park a thread behind a
+    throttled chat.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_wait: float = 0.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping up to max_wait for it, and return 0.
+
+        If the wait would exceed max_wait, take nothing and return the
+        seconds until a token is available instead.
+        """
+        with self.lock:
+            self._refill(time.monotonic())
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0
+            if wait > self.max_wait:
+                return wait
+            # Reserve the token up front so concurrent callers queue in order;
+            # the deficit is bounded by max_wait * rate
+            self.tokens -= 1
+        if wait:
+            time.sleep(wait)
+        return 0
+
+    def refund(self):
+        """Give back a token taken for a call that did not go ahead."""
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+
+# Telegram limits: ~30 msg/s per bot overall, 20 msg/min per chat.
+# The global bucket may briefly sleep; per-chat buckets never do.
+GLOBAL_RATE_LIMIT = RateLimiter(rate=30, capacity=30, max_wait=2.0)
+CHAT_RATE = 20 / 60
+CHAT_BURST = 20
+MAX_TRACKED_CHATS = 10000
+CHAT_RATE_LIMITS = OrderedDict()
+_chat_limits_lock = threading.Lock()
+
+
+def _chat_rate_limit(chat_id: str) -> RateLimiter:
+    """Get (or create) the bucket for chat_id, evicting idle buckets past the cap."""
+    with _chat_limits_lock:
+        limiter = CHAT_RATE_LIMITS.get(chat_id)
+        if limiter is not None:
+            CHAT_RATE_LIMITS.move_to_end(chat_id)
+            return limiter
+        limiter = CHAT_RATE_LIMITS[chat_id] = RateLimiter(rate=CHAT_RATE, capacity=CHAT_BURST)
+        # Least recently used first; an idle bucket has refilled and carries no state
+        while len(CHAT_RATE_LIMITS) > MAX_TRACKED_CHATS:
+            CHAT_RATE_LIMITS.popitem(last=False)
+        return limiter
+
+
+def throttle(chat_id: str) -> float:
+    """
+    Reserve a send slot for chat_id within Telegram's rate limits.
+
+    Returns 0 once the slot is reserved. If the chat is over its per-chat
+    limit (or the bot-wide backlog is too deep) nothing is reserved and the
+    seconds to wait before retrying are returned instead.
+    """
+    chat_limit = _chat_rate_limit(str(chat_id))
+    retry_after = chat_limit.acquire()
+    if retry_after:
+        return retry_after
+    retry_after = GLOBAL_RATE_LIMIT.acquire()
+    if retry_after:
+        # Nothing is sent, so the chat keeps its quota
+        chat_limit.refund()
+    return retry_after
+
+
+# Background queues so /send returns without waiting on Telegram. Each chat
+# always maps to the same queue and worker, so its messages go out in order.
+# MAX_QUEUED_JOBS bounds jobs queued or held back by a chat's rate limit.
+SEND_WORKERS = 8
+SEND_QUEUES = [queue.Queue() for _ in range(SEND_WORKERS)]
+MAX_QUEUED_JOBS = 10000
+JOB_RESULTS = OrderedDict()
+MAX_JOB_RESULTS = 10000
+_job_results_lock = threading.Lock()
+_send_workers_lock = threading.Lock()
+_send_workers_started = False
+_queued_jobs = 0
+
+_FORMATTER = string.Formatter()
+
+
+# Config/template edits are picked up within this many seconds
+FILE_CHECK_INTERVAL = 1.0
+_mtime_cache = {}
+
+
+def file_mtime_ns(path):
+    """
+    st_mtime_ns of path (None if missing), re-checked at most once per
+    FILE_CHECK_INTERVAL so the hot path usually skips the stat syscall.
+    """
+    now = time.monotonic()
+    cached = _mtime_cache.get(path)
+    if cached is not None and now - cached[0] < FILE_CHECK_INTERVAL:
+        return cached[1]
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    _mtime_cache[path] = (now, mtime)
+    return mtime
+
 
 def get_authorized_chats():
-    """Get list of chat IDs authorized to use bot commands."""
-    config = load_config()
-    return config.get("authorized_chats", [])
+    """Get the set of chat IDs (as strings) authorized to use bot commands."""
+    return load_config().get("_authorized_chats", frozenset())
+
+
+@lru_cache(maxsize=1)
+def _load_config_cached(mtime_ns: int) -> dict:
+    """Parse the config file; cached until its mtime changes."""
+    with open(CONFIG_FILE, "rb") as f:
+        config = json_loads(f.read())
+    bot_token = config.get("telegram_bot_token", "")
+    config["_telegram_send_url"] = (
+        f"https://api.telegram.org/bot{bot_token}/sendMessage" if bot_token else None
+    )
+    config["_api_key_hashes"] = frozenset(
+        # Header values are always strings, so non-string entries could never match
+        hash_api_key(key) for key in config.get("api_keys") or [] if isinstance(key, str)
+    )
+    config["_authorized_chats"] = frozenset(
+        str(chat_id) for chat_id in config.get("authorized_chats") or []
+    )
+    config["_vms_url"], config["_vm_headers"] = _vm_api_settings(config)
+    return config
+
+
+def _vm_api_settings(config: dict) -> tuple:
+    """VM Monitor list URL and auth headers derived from config."""
+    # Coerce rather than raise: a bad value here must not take down the whole
+    # config (API keys, bot token) in load_config()
+    vm_monitor_url = str(config.get("vm_monitor_url") or "http://localhost:5000")
+    api_key = config.get("vm_monitor_api_key")
+    headers = {"X-API-Key": str(api_key)} if api_key else {}
+    return f"{vm_monitor_url.rstrip('/')}/api/vms", headers
+
+
+_DEFAULT_VM_API_SETTINGS = _vm_api_settings({})
 
 
 def load_config():
-    """Load config from file."""
-    if not CONFIG_FILE.exists():
+    """Load config from file, re-reading it only when it has changed."""
+    mtime = file_mtime_ns(CONFIG_FILE)
+    if mtime is None:
         return {}
     try:
-        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return _load_config_cached(mtime)
     except Exception as e:
-        logger.error(f"Error loading config: {e}")
+        logger.error("Error loading config: %s", e)
         return {}
 
 
-def load_templates():
-    """Load message templates."""
-    if not TEMPLATES_FILE.exists():
-        return DEFAULT_TEMPLATES
+def get_vm_api_settings() -> tuple:
+    """Get the (VM list URL, request headers) pair for the VM Monitor API."""
+    config = load_config()
+    if "_vms_url" not in config:
+        return _DEFAULT_VM_API_SETTINGS
+    return config["_vms_url"], config["_vm_headers"]
+
+
+def hash_api_key(api_key: str) -> bytes:
+    """SHA-256 digest of an API key, used for constant-time comparison."""
+    return hashlib.sha256(api_key.encode()).digest()
+
+
+def is_valid_api_key(api_key: str) -> bool:
+    """Check an API key against the configured keys in constant time."""
+    digest = hash_api_key(api_key)
+    return any(
+        hmac.compare_digest(digest, key_hash)
+        for key_hash in load_config().get("_api_key_hashes", ())
+    )
+
+
+def compile_template(template: str):
+    """
+    Pre-parse a str.format template into (literal, field, spec) segments.
+
+    Returns None for templates using features beyond plain named fields
+    (conversions, attribute/index access, nested specs); those are
+    rendered with str.format instead.
+    """
+    try:
+        parts = list(_FORMATTER.parse(template))
+    except (ValueError, TypeError):
+        return None
+    compiled = []
+    for literal, field, spec, conversion in parts:
+        if field is not None and (conversion or not field.isidentifier() or "{" in spec):
+            return None
+        compiled.append((literal, field, spec))
+    return tuple(compiled)
+
+
+# Loaded templates plus what is derived from them once per reload:
+# compiled segments, the name list, and the variables each template needs
+TemplateSet = namedtuple("TemplateSet", "templates compiled names fields")
+
+
+def _required_fields(parts):
+    """Variable names a compiled template needs, or None if not compiled."""
+    if parts is None:
+        return None
+    return frozenset(field for _, field, _ in parts if field is not None)
+
+
+def _build_template_set(templates: dict) -> TemplateSet:
+    compiled = {name: compile_template(tmpl) for name, tmpl in templates.items()}
+    return TemplateSet(
+        templates=templates,
+        compiled=compiled,
+        names=tuple(templates),
+        fields={name: _required_fields(parts) for name, parts in compiled.items()},
+    )
+
+
+_DEFAULT_TEMPLATE_SET = _build_template_set(DEFAULT_TEMPLATES)
+
+
+@lru_cache(maxsize=1)
+def _load_templates_cached(mtime_ns: int) -> TemplateSet:
+    """Parse, merge and compile the templates file; cached until its mtime changes."""
+    with open(TEMPLATES_FILE, "rb") as f:
+        loaded = json_loads(f.read())
+    # A non-string entry can't be rendered; keep the default (if any) for that name
+    templates = {**DEFAULT_TEMPLATES, **{
+        name: template for name, template in loaded.items() if isinstance(template, str)
+    }}
+    return _build_template_set(templates)
+
+
+def _load_template_set() -> TemplateSet:
+    """Return the TemplateSet for the current templates file."""
+    mtime = file_mtime_ns(TEMPLATES_FILE)
+    if mtime is None:
+        return _DEFAULT_TEMPLATE_SET
     try:
-        with open(TEMPLATES_FILE, "r", encoding="utf-8") as f:
-            templates = json.load(f)
-            return {**DEFAULT_TEMPLATES, **templates}
+        return _load_templates_cached(mtime)
     except Exception as e:
-        logger.error(f"Error loading templates: {e}")
-        return DEFAULT_TEMPLATES
+        logger.error("Error loading templates: %s", e)
+        return _DEFAULT_TEMPLATE_SET
+
+
+def render(template_set: TemplateSet, template_name: str, variables: dict) -> str:
+    """Render a template from template_set; raises KeyError for missing variables."""
+    parts = template_set.compiled[template_name]
+    if parts is None:
+        return template_set.templates[template_name].format(**variables)
+    return "".join(
+        literal + (format(variables[field], spec) if field is not None else "")
+        for literal, field, spec in parts
+    )
+
+
+_TS_CACHE = [0, ""]
+
+
+def now_str() -> str:
+    """Current local time as "YYYY-mm-dd HH:MM:SS", formatted at most once per second."""
+    t = int(time.time())
+    if _TS_CACHE[0] != t:
+        # Benign race: concurrent threads at worst format the same second twice
+        _TS_CACHE[:] = [t, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))]
+    return _TS_CACHE[1]
 
 
 def require_api_key(f):
     """Decorator to require API key authentication."""
     @wraps(f)
     def decorated(*args, **kwargs):
-        config = load_config()
-        api_keys = config.get("api_keys", [])
-        
         # Get API key from header or query param
         api_key = request.headers.get("X-API-Key") or request.args.get("api_key")
         
         if not api_key:
-            return jsonify({"error": "Missing API key"}), 401
+            return json_response(ERR_MISSING_API_KEY, 401)
         
-        if api_key not in api_keys:
-            logger.warning(f"Invalid API key attempt: {api_key[:8]}...")
-            return jsonify({"error": "Invalid API key"}), 403
+        if not is_valid_api_key(api_key):
+            logger.warning("Invalid API key attempt: %s...", api_key[:8])
+            return json_response(ERR_INVALID_API_KEY, 403)
         
         return f(*args, **kwargs)
     return decorated
@@ -99,70 +464,301 @@ def require_api_key(f):
 
 def send_telegram_message(chat_id: str, text: str) -> dict:
     """Send message via Telegram Bot API."""
-    config = load_config()
-    bot_token = config.get("telegram_bot_token", "")
+    url = load_config().get("_telegram_send_url")
     
-    if not bot_token:
+    if not url:
         return {"ok": False, "error": "Bot token not configured"}
     
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+    retry_after = throttle(chat_id)
+    if retry_after:
+        logger.warning("Rate limit exceeded for chat %s, retry in %.1fs", chat_id, retry_after)
+        return {"ok": False, "error": "Rate limit exceeded, retry later", "retry_after": retry_after}
     
     try:
-        response = requests.post(url, json={
+        response = TELEGRAM_SESSION.post(url, data=json_dumpb({
             "chat_id": chat_id,
             "text": text,
             "parse_mode": "Markdown"
-        }, timeout=30)
+        }), headers=JSON_HEADERS, timeout=30)
         
-        result = response.json()
+        result = json_loads(response.content)
         if result.get("ok"):
-            logger.info(f"Telegram message sent to {chat_id}")
+            logger.info("Telegram message sent to %s", chat_id)
         else:
-            logger.error(f"Telegram error: {result.get('description')}")
+            logger.error("Telegram error: %s", result.get("description"))
         return result
     except Exception as e:
-        logger.error(f"Telegram request error: {e}")
+        logger.error("Telegram request error: %s", e)
         return {"ok": False, "error": str(e)}
 
 
+def _markdown_split_point(text: str, limit: int) -> int:
+    """
+    Index at or below limit to split text at without breaking a Markdown
+    entity (*bold*, _italic_, `code`, ```pre```, [link](url)): the last line
+    break outside one, else the last space, else the last position outside
+    one. Falls back to a hard cut at limit.
+    """
+    line_break = space = safe = None
+    entity = None
+    i = 0
+    end = min(len(text), limit + 1)
+    while i < end:
+        ch = text[i]
+        if entity is None:
+            safe = i
+            if ch == "\n":
+                line_break = i
+            elif ch.isspace():
+                space = i
+            elif ch == "\\":
+                i += 1
+            elif text.startswith("```", i):
+                entity = "```"
+                i += 2
+            elif ch in "*_`[":
+                entity = ch
+        elif entity == "[":
+            if ch == "]":
+                if text.startswith("](", i):
+                    entity = ")"
+                    i += 1
+                else:
+                    entity = None
+        elif text.startswith(entity, i):
+            i += len(entity) - 1
+            entity = None
+        i += 1
+    return line_break or space or safe or limit
+
+
+def _split_message(message: str, limit: int):
+    """Yield the non-empty pieces of message, each at most limit chars."""
+    while len(message) > limit:
+        cut = _markdown_split_point(message, limit)
+        piece, message = message[:cut].rstrip(), message[cut:].lstrip()
+        if piece:
+            yield piece
+    if message.strip():
+        yield message
+
+
+def chunk_messages(messages: list, separator: str = AGGREGATE_SEPARATOR,
+                   limit: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> list:
+    """Join messages with separator into as few texts of at most limit chars as possible."""
+    chunks = []
+    current = None
+    for message in messages:
+        # A single oversized message is split between lines, outside Markdown entities
+        for piece in _split_message(message, limit):
+            if current is not None and len(current) + len(separator) + len(piece) <= limit:
+                current += separator + piece
+            else:
+                if current is not None:
+                    chunks.append(current)
+                current = piece
+    if current is not None:
+        chunks.append(current)
+    return chunks
+
+
+def _record_job(job_id: str, status: dict):
+    """Store a job's status, evicting the oldest entries past the limit."""
+    with _job_results_lock:
+        JOB_RESULTS[job_id] = status
+        JOB_RESULTS.move_to_end(job_id)
+        while len(JOB_RESULTS) > MAX_JOB_RESULTS:
+            JOB_RESULTS.popitem(last=False)
+
+
+def _finish_job(job: dict, status: dict):
+    """Record a job's final status and free its slot in the send queue."""
+    global _queued_jobs
+    _record_job(job["job_id"], status)
+    with _job_results_lock:
+        _queued_jobs -= 1
+
+
+def _deliver(job: dict) -> float:
+    """
+    Send a queued job and record the outcome.
+
+    Returns 0 when the job is done (sent or failed), or the seconds to wait
+    if the rate limit refused it; the job then stays queued.
+    """
+    try:
+        result = send_telegram_message(job["chat_id"], job["text"])
+    except Exception as e:
+        logger.error("Send worker error: %s", e)
+        _finish_job(job, {"status": "failed", "chat_id": job["chat_id"], "error": str(e)})
+        return 0
+    if result.get("retry_after"):
+        return result["retry_after"]
+    if result.get("ok"):
+        status = {"status": "sent", "chat_id": job["chat_id"]}
+    else:
+        status = {
+            "status": "failed",
+            "chat_id": job["chat_id"],
+            "error": result.get("description") or result.get("error", "Unknown error")
+        }
+    _finish_job(job, status)
+    return 0
+
+
+def _send_queue(chat_id: str) -> queue.Queue:
+    """The send queue that owns chat_id."""
+    return SEND_QUEUES[hash(chat_id) % SEND_WORKERS]
+
+
+def _send_worker(send_queue: queue.Queue):
+    """
+    Drain send_queue, delivering each job via Telegram.
+
+    A job refused by the rate limit is held, together with any later jobs
+    for the same chat so they keep their order, and retried once the limit
+    allows rather than failed or slept on.
+    """
+    held = {}  # chat_id -> [not_before, deque of jobs]
+    while True:
+        timeout = None
+        if held:
+            timeout = max(0, min(entry[0] for entry in held.values()) - time.monotonic())
+        try:
+            job = send_queue.get(timeout=timeout)
+        except queue.Empty:
+            job = None
+        if job is not None:
+            if job["chat_id"] in held:
+                held[job["chat_id"]][1].append(job)
+            else:
+                retry_after = _deliver(job)
+                if retry_after:
+                    held[job["chat_id"]] = [time.monotonic() + retry_after, deque([job])]
+            send_queue.task_done()
+        
+        now = time.monotonic()
+        for chat_id, entry in list(held.items()):
+            if entry[0] > now:
+                continue
+            jobs = entry[1]
+            while jobs:
+                retry_after = _deliver(jobs[0])
+                if retry_after:
+                    entry[0] = time.monotonic() + retry_after
+                    break
+                jobs.popleft()
+            if not jobs:
+                del held[chat_id]
+
+
+def _start_send_workers():
+    """Start the send worker threads once per process (after any fork)."""
+    global _send_workers_started
+    if _send_workers_started:
+        return
+    with _send_workers_lock:
+        if _send_workers_started:
+            return
+        for i, send_queue in enumerate(SEND_QUEUES):
+            threading.Thread(
+                target=_send_worker, args=(send_queue,), name=f"send-worker-{i}", daemon=True
+            ).start()
+        _send_workers_started = True
+
+
+def enqueue_message(chat_id: str, text: str):
+    """Queue a message for background delivery. Returns a job id, or None if the queue is full."""
+    global _queued_jobs
+    _start_send_workers()
+    with _job_results_lock:
+        if _queued_jobs >= MAX_QUEUED_JOBS:
+            return None
+        _queued_jobs += 1
+    job_id = uuid4().hex
+    # Record before queueing so a fast worker's result isn't overwritten
+    _record_job(job_id, {"status": "queued", "chat_id": chat_id})
+    _send_queue(chat_id).put_nowait({"job_id": job_id, "chat_id": chat_id, "text": text})
+    return job_id
+
+
+def parse_percent(value):
+    """
+    Parse a percentage such as "45%", "45.5" or 45 to a float.
+
+    Returns None for anything that isn't a finite, non-negative number.
+    """
+    if isinstance(value, (int, float)):
+        pct = float(value)
+    else:
+        try:
+            pct = float(value.rstrip("%"))
+        except (AttributeError, ValueError):
+            return None
+    return pct if math.isfinite(pct) and pct >= 0 else None
+
+
+VM_CACHE_TTL = 5  # seconds
+_vm_cache = {"ts": 0.0, "data": None}
+_vm_cache_lock = threading.Lock()
+
+
+def fetch_vms():
+    """
+    Fetch the VM list from the VM Monitor API, reusing a response younger
+    than VM_CACHE_TTL so back-to-back bot commands share one request.
+
+    Returns (vms, None) on success or (None, error_message) on failure.
+    """
+    now = time.monotonic()
+    with _vm_cache_lock:
+        if _vm_cache["data"] is not None and now - _vm_cache["ts"] < VM_CACHE_TTL:
+            return _vm_cache["data"], None
+
+    vms_url, headers = get_vm_api_settings()
+    response = VM_SESSION.get(vms_url, headers=headers, timeout=10)
+    if response.status_code != 200:
+        logger.warning("VM Monitor API error %s: %s", response.status_code, response.text[:200])
+        return None, f"⚠️ API Error: {response.status_code}"
+
+    vms = json_loads(response.content)
+    if isinstance(vms, dict) and "vms" in vms:
+        vms = vms["vms"]
+
+    if not isinstance(vms, list):
+        return None, f"⚠️ API returned {type(vms)}, expected list"
+
+    with _vm_cache_lock:
+        _vm_cache.update(ts=now, data=vms)
+    return vms, None
+
+
 def fetch_vm_summary():
     """Fetch VM summary from VM Monitor API."""
-    config = load_config()
-    vm_monitor_url = config.get("vm_monitor_url", "http://localhost:5000")
-    api_key = config.get("vm_monitor_api_key", "")
-    headers = {"X-API-Key": api_key} if api_key else {}
-    
     try:
-        response = requests.get(f"{vm_monitor_url}/api/vms", headers=headers, timeout=10)
-        if response.status_code != 200:
-             return f"⚠️ API Error: {response.status_code} - {response.text}"
-             
-        vms = response.json()
-        
-        if isinstance(vms, dict) and "vms" in vms:
-            vms = vms["vms"]
-            
-        if not isinstance(vms, list):
-             return f"⚠️ Unexpected API response type: {type(vms)}"
+        vms, error = fetch_vms()
+        if error:
+            return error
         
-        # Count online/offline
-        online = sum(1 for vm in vms if vm.get("status") == "online")
-        offline = sum(1 for vm in vms if vm.get("status") == "offline")
-        
-        # Count alerts/warnings
-        alerts = 0
-        warnings = 0
+        # Count online/offline and alerts/warnings in one pass
+        online = offline = alerts = warnings = 0
         for vm in vms:
-            cpu = vm.get("cpu_avg", 0)
-            ram = vm.get("ram_percent", 0)
+            get = vm.get
+            status = get("status")
+            if status == "online":
+                online += 1
+            elif status == "offline":
+                offline += 1
+            
+            cpu = get("cpu_avg", 0)
             if cpu >= 90:
                 alerts += 1
             elif cpu >= 80:
                 warnings += 1
             
             # Check RAM (skip if ballooning)
-            balloon = vm.get("balloon_enabled", False)
-            if not balloon:
+            if not get("balloon_enabled", False):
+                ram = get("ram_percent", 0)
                 if ram >= 90:
                     alerts += 1
                 elif ram >= 80:
@@ -183,56 +779,44 @@ def fetch_vm_summary():
         
         return "\n".join(lines)
     except Exception as e:
-        logger.error(f"Error fetching VM summary: {e}")
+        logger.error("Error fetching VM summary: %s", e)
         return f"❌ Error fetching VMs: {e}"
 
 
 def fetch_vm_alerts():
     """Fetch only VMs with alerts/warnings."""
-    config = load_config()
-    vm_monitor_url = config.get("vm_monitor_url", "http://localhost:5000")
-    api_key = config.get("vm_monitor_api_key", "")
-    headers = {"X-API-Key": api_key} if api_key else {}
-    
     try:
-        response = requests.get(f"{vm_monitor_url}/api/vms", headers=headers, timeout=10)
-        if response.status_code != 200:
-             return f"⚠️ API Error: {response.status_code}"
-             
-        vms = response.json()
-        if isinstance(vms, dict) and "vms" in vms:
-            vms = vms["vms"]
-            
-        if not isinstance(vms, list):
-             return f"⚠️ API returned {type(vms)}, expected list"
+        vms, error = fetch_vms()
+        if error:
+            return error
         
         issues = []
         for vm in vms:
-            cpu = vm.get("cpu_avg", 0)
-            ram = vm.get("ram_percent", 0)
-            disk_str = vm.get("disk_usage", "0%")
-            is_online = vm.get("online", False)
-            status = "online" if is_online else "offline"
-            last_seen = vm.get("last_seen", "").replace("T", " ")[:16]
-
+            get = vm.get
+            if not get("online", False):
+                last_seen = get("last_seen", "").replace("T", " ")[:16]
+                issues.append(f"🔴 *{get('hostname')}* is OFFLINE\n    └ _Last seen: {last_seen}_")
+                continue
+            
+            cpu = get("cpu_avg", 0)
+            # RAM is ignored when ballooning
+            ram = 0 if get("balloon_enabled", False) else get("ram_percent", 0)
+            
             # Parse disk
             try:
-                disk = float(disk_str.strip('%'))
+                disk = float(get("disk_usage", "0%").strip('%'))
             except:
                 disk = 0
-
-            if not is_online:
-                issues.append(f"🔴 *{vm.get('hostname')}* is OFFLINE\n    └ _Last seen: {last_seen}_")
-            elif cpu >= 80 or (ram >= 80 and not vm.get("balloon_enabled", False)) or disk >= 90:
+            
+            if cpu >= 80 or ram >= 80 or disk >= 90:
                 reason = []
                 if cpu >= 80: reason.append(f"CPU {cpu:.0f}%")
-                if ram >= 80 and not vm.get("balloon_enabled", False): reason.append(f"RAM {ram:.0f}%")
+                if ram >= 80: reason.append(f"RAM {ram:.0f}%")
                 if disk >= 90: reason.append(f"Disk {disk:.0f}%")
                 
-                balloon = vm.get("balloon_enabled", False)
-                high_usage = cpu >= 90 or (ram >= 90 and not balloon) or disk >= 95
+                high_usage = cpu >= 90 or ram >= 90 or disk >= 95
                 emoji = "🔴" if high_usage else "⚠️"
-                issues.append(f"{emoji} *{vm.get('hostname')}*: {', '.join(reason)}")
+                issues.append(f"{emoji} *{get('hostname')}*: {', '.join(reason)}")
 
         if not issues:
             return "✅ *System Healthy*\nNo active alerts found."
@@ -240,28 +824,16 @@ def fetch_vm_alerts():
         return "🚨 *Active Alerts*\n\n" + "\n\n".join(issues)
 
     except Exception as e:
-        logger.error(f"Error fetching alerts: {e}")
+        logger.error("Error fetching alerts: %s", e)
         return f"❌ Error: {e}"
 
 
 def fetch_vm_single(hostname_query):
     """Fetch details for a specific VM."""
-    config = load_config()
-    vm_monitor_url = config.get("vm_monitor_url", "http://localhost:5000")
-    api_key = config.get("vm_monitor_api_key", "")
-    headers = {"X-API-Key": api_key} if api_key else {}
-    
     try:
-        response = requests.get(f"{vm_monitor_url}/api/vms", headers=headers, timeout=10)
-        if response.status_code != 200:
-             return f"⚠️ API Error: {response.status_code}"
-
-        vms = response.json()
-        if isinstance(vms, dict) and "vms" in vms:
-            vms = vms["vms"]
-            
-        if not isinstance(vms, list):
-             return f"⚠️ API returned {type(vms)}, expected list"
+        vms, error = fetch_vms()
+        if error:
+            return error
             
         matches = [v for v in vms if hostname_query.lower() in v.get("hostname", "").lower()]
         
@@ -297,39 +869,27 @@ def fetch_vm_single(hostname_query):
         )
 
     except Exception as e:
-        logger.error(f"Error fetching VM: {e}")
+        logger.error("Error fetching VM: %s", e)
         return f"❌ Error: {e}"
 
 
 def fetch_vm_detailed():
     """Fetch detailed VM list."""
-    config = load_config()
-    vm_monitor_url = config.get("vm_monitor_url", "http://localhost:5000")
-    api_key = config.get("vm_monitor_api_key", "")
-    headers = {"X-API-Key": api_key} if api_key else {}
-    
     try:
-        response = requests.get(f"{vm_monitor_url}/api/vms", headers=headers, timeout=10)
-        if response.status_code != 200:
-             return f"⚠️ API Error: {response.status_code}"
-
-        vms = response.json()
-        if isinstance(vms, dict) and "vms" in vms:
-            vms = vms["vms"]
-            
-        if not isinstance(vms, list):
-             return f"⚠️ API returned {type(vms)}, expected list"
+        vms, error = fetch_vms()
+        if error:
+            return error
         
         # Header
-        table = f"{'Host':<14} {'CPU':<4} {'RAM':<4} {'Disk':<4}\n"
-        table += "-" * 30 + "\n"
+        rows = [f"{'Host':<14} {'CPU':<4} {'RAM':<4} {'Disk':<4}", "-" * 30]
         
-        vms_sorted = sorted(vms, key=lambda v: (
+        # Only the first 20 rows are shown, so select them without sorting the whole fleet
+        vms_shown = heapq.nsmallest(20, vms, key=lambda v: (
             v.get("status") == "online",
             -v.get("cpu_avg", 0)
         ))
         
-        for vm in vms_sorted[:20]:
+        for vm in vms_shown:
             is_online = vm.get("online", False)
             # Truncate hostname to 14 chars
             hostname = vm.get("hostname", "?")[:13]
@@ -340,35 +900,31 @@ def fetch_vm_detailed():
                 
                 # Handle disk parsing (it's a dict like {'/': '20%'})
                 disk_data = vm.get("disk_usage")
-                disk_val = 0
                 if isinstance(disk_data, dict):
                     # Find max usage across mounts
-                    try:
-                        disk_val = max([float(v.strip('%')) for v in disk_data.values() if v.strip('%').replace('.', '', 1).isdigit()], default=0)
-                    except Exception:
-                        disk_val = 0
-                elif isinstance(disk_data, (int, float)):
-                    disk_val = disk_data
-                elif isinstance(disk_data, str):
-                    # Fallback for string "45%"
-                    try:
-                        disk_val = float(disk_data.strip('%'))
-                    except:
-                        disk_val = 0
+                    disk_val = max(
+                        (pct for pct in map(parse_percent, disk_data.values()) if pct is not None),
+                        default=0
+                    )
+                else:
+                    # Fallback for a number or a string "45%"
+                    disk_val = parse_percent(disk_data) or 0
                         
                 disk = f"{disk_val:.0f}%"
                 
-                table += f"{hostname:<14} {cpu:<4} {ram:<4} {disk:<4}\n"
+                rows.append(f"{hostname:<14} {cpu:<4} {ram:<4} {disk:<4}")
             else:
-                table += f"{hostname:<14} 🔴 OFFLINE\n"
+                rows.append(f"{hostname:<14} 🔴 OFFLINE")
         
+        rows.append("")  # table ends with a newline
         if len(vms) > 20:
-            table += f"\n...and {len(vms) - 20} more"
+            rows.append(f"...and {len(vms) - 20} more")
+        table = "\n".join(rows)
         
         return f"📋 *Fleet Status*\n```\n{table}```"
 
     except Exception as e:
-        logger.error(f"Error fetching VM details: {e}")
+        logger.error("Error fetching VM details: %s", e)
         return f"❌ Error: {e}"
 
 
@@ -376,8 +932,8 @@ def handle_bot_command(chat_id: str, command: str, user_name: str = ""):
     """Handle incoming bot commands."""
     # Check authorization - FAIL-SECURE: Deny if no authorized chats configured
     authorized = get_authorized_chats()
-    if not authorized or str(chat_id) not in [str(c) for c in authorized]:
-        logger.warning(f"Unauthorized command attempt from {chat_id} ({user_name})")
+    if not authorized or str(chat_id) not in authorized:
+        logger.warning("Unauthorized command attempt from %s (%s)", chat_id, user_name)
         send_telegram_message(chat_id, "⛔ You are not authorized to use this bot.")
         return
     
@@ -431,16 +987,29 @@ def handle_bot_command(chat_id: str, command: str, user_name: str = ""):
         send_telegram_message(chat_id, "❓ Unknown command. Try /help")
 
 
+@app.errorhandler(413)
+def request_too_large(e):
+    """Reject bodies over MAX_CONTENT_LENGTH before they are parsed."""
+    return json_response(ERR_TOO_LARGE, 413)
+
+
 @app.route("/")
 def index():
     """Health check endpoint."""
     return jsonify({
         "service": "message-relay",
         "status": "ok",
-        "version": "1.1.0"
+        "version": VERSION
     })
 
 
+def _log_command_error(future):
+    """Log exceptions raised by background bot commands."""
+    error = future.exception()
+    if error:
+        logger.error("Bot command failed: %s", error)
+
+
 @app.route("/webhook", methods=["POST"])
 def telegram_webhook():
     """Handle incoming Telegram updates (webhook mode)."""
@@ -463,8 +1032,9 @@ def telegram_webhook():
     # Only handle commands (messages starting with /)
     if text.startswith("/"):
         # Log the raw text for debugging, pass full text to handler
-        logger.info(f"Bot command from {chat_id} ({user_name}): {text}")
-        handle_bot_command(str(chat_id), text, user_name)
+        logger.info("Bot command from %s (%s): %s", chat_id, user_name, text)
+        future = COMMAND_EXECUTOR.submit(handle_bot_command, str(chat_id), text, user_name)
+        future.add_done_callback(_log_command_error)
     
     return jsonify({"ok": True})
 
@@ -479,20 +1049,32 @@ def setup_webhook():
     if not webhook_url:
         return jsonify({"error": "webhook_url is required"}), 400
     
+    # Discarding updates can't be undone, so only a real JSON boolean turns it on
+    drop_pending_updates = data.get("drop_pending_updates", False)
+    if not isinstance(drop_pending_updates, bool):
+        return jsonify({"error": "drop_pending_updates must be true or false"}), 400
+    
     config = load_config()
     bot_token = config.get("telegram_bot_token", "")
     
     if not bot_token:
         return jsonify({"error": "Bot token not configured"}), 400
     
-    # Set webhook
+    # Set webhook; only "message" updates are handled, so don't ask for others
     url = f"https://api.telegram.org/bot{bot_token}/setWebhook"
+    payload = {
+        "url": webhook_url,
+        "max_connections": 100,
+        "allowed_updates": ["message"],
+        "drop_pending_updates": drop_pending_updates
+    }
     try:
-        response = requests.post(url, json={"url": webhook_url}, timeout=30)
-        result = response.json()
+        response = TELEGRAM_SESSION.post(url, data=json_dumpb(payload),
+                                         headers=JSON_HEADERS, timeout=30)
+        result = json_loads(response.content)
         
         if result.get("ok"):
-            logger.info(f"Webhook set to {webhook_url}")
+            logger.info("Webhook set to %s", webhook_url)
             return jsonify({"success": True, "message": "Webhook configured"})
         else:
             return jsonify({"error": result.get("description")}), 400
@@ -512,8 +1094,8 @@ def delete_webhook():
     
     url = f"https://api.telegram.org/bot{bot_token}/deleteWebhook"
     try:
-        response = requests.post(url, timeout=30)
-        result = response.json()
+        response = TELEGRAM_SESSION.post(url, timeout=30)
+        result = json_loads(response.content)
         
         if result.get("ok"):
             logger.info("Webhook deleted")
@@ -528,13 +1110,58 @@ def delete_webhook():
 @require_api_key
 def list_templates():
     """List available message templates."""
-    templates = load_templates()
+    template_set = _load_template_set()
     return jsonify({
-        "templates": list(templates.keys()),
-        "details": templates
+        "templates": template_set.names,
+        "details": template_set.templates
     })
 
 
+def _prepare_message(data: dict):
+    """
+    Validate the template fields of a send request and render the message.
+
+    Returns (message, None) on success or (None, error_response) on failure.
+    """
+    template_name = data.get("template")
+    variables = data.get("variables", {})
+    
+    if not template_name:
+        return None, (jsonify({"error": "template is required"}), 400)
+    
+    template_set = _load_template_set()
+    
+    if template_name not in template_set.templates:
+        return None, (jsonify({
+            "error": f"Unknown template: {template_name}",
+            "available": template_set.names
+        }), 400)
+    
+    # Add timestamp if not provided
+    if "timestamp" not in variables:
+        variables["timestamp"] = now_str()
+    
+    def missing_variable(names):
+        return None, (jsonify({
+            "error": f"Missing variable: {names}",
+            "template": template_set.templates[template_name],
+            "provided": list(variables.keys())
+        }), 400)
+    
+    # Compiled templates know their fields, so every missing one is reported;
+    # the str.format fallback only surfaces the first
+    required = template_set.fields[template_name]
+    if required is not None:
+        missing = required.difference(variables)
+        if missing:
+            return missing_variable(", ".join(repr(name) for name in sorted(missing)))
+    
+    try:
+        return render(template_set, template_name, variables), None
+    except KeyError as e:
+        return missing_variable(e)
+
+
 @app.route("/send", methods=["POST"])
 @require_api_key
 def send_message():
@@ -555,58 +1182,45 @@ def send_message():
     data = request.get_json()
     
     if not data:
-        return jsonify({"error": "Request body required"}), 400
+        return json_response(ERR_NO_BODY, 400)
     
-    template_name = data.get("template")
     chat_id = data.get("chat_id")
-    variables = data.get("variables", {})
-    
-    if not template_name:
-        return jsonify({"error": "template is required"}), 400
-    
     if not chat_id:
         return jsonify({"error": "chat_id is required"}), 400
     
-    # Load templates
-    templates = load_templates()
+    message, error = _prepare_message(data)
+    if error:
+        return error
     
-    if template_name not in templates:
-        return jsonify({
-            "error": f"Unknown template: {template_name}",
-            "available": list(templates.keys())
-        }), 400
-    
-    # Format message
-    template = templates[template_name]
-    
-    # Add timestamp if not provided
-    if "timestamp" not in variables:
-        variables["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Queue for delivery; poll /status/<job_id> for the outcome
+    job_id = enqueue_message(str(chat_id), message)
     
-    try:
-        message = template.format(**variables)
-    except KeyError as e:
+    if not job_id:
         return jsonify({
-            "error": f"Missing variable: {e}",
-            "template": template,
-            "provided": list(variables.keys())
-        }), 400
+            "success": False,
+            "error": "Send queue is full, try again later"
+        }), 503
+    
+    return jsonify({
+        "success": True,
+        "message": "Message queued",
+        "job_id": job_id,
+        "chat_id": chat_id,
+        "template": data["template"]
+    }), 202
+
+
+@app.route("/status/<job_id>")
+@require_api_key
+def job_status(job_id):
+    """Get the delivery status of a queued /send job."""
+    with _job_results_lock:
+        status = JOB_RESULTS.get(job_id)
     
-    # Send via Telegram
-    result = send_telegram_message(chat_id, message)
+    if status is None:
+        return jsonify({"error": "Unknown job_id"}), 404
     
-    if result.get("ok"):
-        return jsonify({
-            "success": True,
-            "message": "Message sent",
-            "chat_id": chat_id,
-            "template": template_name
-        })
-    else:
-        return jsonify({
-            "success": False,
-            "error": result.get("description") or result.get("error", "Unknown error")
-        }), 500
+    return jsonify({"job_id": job_id, **status})
 
 
 @app.route("/send/batch", methods=["POST"])
@@ -625,47 +1239,35 @@ def send_batch():
     data = request.get_json()
     
     if not data:
-        return jsonify({"error": "Request body required"}), 400
+        return json_response(ERR_NO_BODY, 400)
     
-    template_name = data.get("template")
     chat_ids = data.get("chat_ids", [])
-    variables = data.get("variables", {})
-    
-    if not template_name:
-        return jsonify({"error": "template is required"}), 400
-    
     if not chat_ids:
         return jsonify({"error": "chat_ids is required"}), 400
+    if len(chat_ids) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} chat_ids per batch"}), 400
+    # Dedupe so each recipient gets the message once
+    chat_ids = list(dict.fromkeys(str(chat_id) for chat_id in chat_ids))
     
-    # Load templates
-    templates = load_templates()
+    message, error = _prepare_message(data)
+    if error:
+        return error
     
-    if template_name not in templates:
-        return jsonify({
-            "error": f"Unknown template: {template_name}",
-            "available": list(templates.keys())
-        }), 400
-    
-    # Format message
-    template = templates[template_name]
-    if "timestamp" not in variables:
-        variables["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    try:
-        message = template.format(**variables)
-    except KeyError as e:
-        return jsonify({"error": f"Missing variable: {e}"}), 400
-    
-    # Send to all
+    # Send to all in parallel; a lone recipient is sent inline, skipping the pool hop
+    if len(chat_ids) == 1:
+        sends = [send_telegram_message(chat_ids[0], message)]
+    else:
+        futures = [
+            EXECUTOR.submit(send_telegram_message, chat_id, message)
+            for chat_id in chat_ids
+        ]
+        sends = (future.result() for future in futures)
     results = []
-    for chat_id in chat_ids:
-        result = send_telegram_message(str(chat_id), message)
-        results.append({
-            "chat_id": chat_id,
-            "ok": result.get("ok", False)
-        })
-    
-    success_count = sum(1 for r in results if r["ok"])
+    success_count = 0
+    for chat_id, result in zip(chat_ids, sends):
+        ok = bool(result.get("ok"))
+        success_count += ok
+        results.append({"chat_id": chat_id, "ok": ok})
     
     return jsonify({
         "success": success_count > 0,
@@ -675,6 +1277,68 @@ def send_batch():
     })
 
 
+@app.route("/send/aggregate", methods=["POST"])
+@require_api_key
+def send_aggregate():
+    """
+    Render a template once per variables set and deliver them to one chat
+    as few messages as possible (joined with "---", split at 4096 chars).
+    
+    Request body:
+    {
+        "template": "vm_alert",
+        "chat_id": "8243412741",
+        "variables_list": [{...}, {...}]
+    }
+    """
+    data = request.get_json()
+    
+    if not data:
+        return json_response(ERR_NO_BODY, 400)
+    
+    chat_id = data.get("chat_id")
+    if not chat_id:
+        return jsonify({"error": "chat_id is required"}), 400
+    
+    variables_list = data.get("variables_list")
+    if not isinstance(variables_list, list) or not variables_list \
+            or not all(isinstance(v, dict) for v in variables_list):
+        return jsonify({"error": "variables_list must be a non-empty list of objects"}), 400
+    
+    if len(variables_list) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} entries in variables_list"}), 400
+    
+    messages = []
+    for variables in variables_list:
+        message, error = _prepare_message({"template": data.get("template"), "variables": variables})
+        if error:
+            return error
+        messages.append(message)
+    
+    # Same chat, so send in order rather than in parallel
+    chunks = chunk_messages(messages)
+    if not chunks:
+        return jsonify({"error": "All rendered messages are empty"}), 400
+    sent = 0
+    for chunk in chunks:
+        result = send_telegram_message(str(chat_id), chunk)
+        if not result.get("ok"):
+            return jsonify({
+                "success": False,
+                "sent": sent,
+                "total": len(chunks),
+                "error": result.get("description") or result.get("error", "Unknown error")
+            }), 500
+        sent += 1
+    
+    return jsonify({
+        "success": True,
+        "messages": len(messages),
+        "sent": sent,
+        "total": len(chunks)
+    })
+
+
 if __name__ == "__main__":
     # Ensure instance directory exists
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
@@ -690,10 +1354,10 @@ if __name__ == "__main__":
         }
         with open(CONFIG_FILE, "w", encoding="utf-8") as f:
             json.dump(default_config, f, indent=2)
-        logger.info(f"Created default config at {CONFIG_FILE}")
+        logger.info("Created default config at %s", CONFIG_FILE)
     
     port = int(os.getenv("PORT", 5001))
     debug = os.getenv("DEBUG", "false").lower() == "true"
     
-    logger.info(f"Starting Message Relay on port {port}")
-    app.run(host="0.0.0.0", port=port, debug=debug)
+    logger.info("Starting Message Relay on port %s (dev server; use 'gunicorn app:app' in production)", port)
+    app.run(host="0.0.0.0", port=port, debug=debug, threaded=True)
@@ -0,0 +1,20 @@
+"""
+Gunicorn settings for Message Relay.
+
+Run: gunicorn app:app  (this file is picked up from the working directory)
+
+The service is I/O-bound (nearly all time is spent waiting on Telegram), so
+concurrency comes from threads sharing one process. Rate limiting and the
+Telegram connection pool live in-process, so scale THREADS before WORKERS;
+each extra worker gets its own 30 msg/s budget and its own /status job
+results, so a status poll routed to another worker returns 404.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+threads = int(os.getenv("GUNICORN_THREADS", 32))
+worker_connections = 1000
+timeout = 60